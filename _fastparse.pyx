@@ -0,0 +1,89 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled version of the event loop of Replay.events.
+Build in place with `cythonize -i _fastparse.pyx`, replay.py falls back to the pure Python loop when it is missing.
+"""
+from libc.string cimport memcpy
+
+cdef Py_ssize_t _CHUNK_SIZE = 1 << 20
+cdef Py_ssize_t _SLICE_HEADER_SIZE = 6  # float time + uint16 event count
+cdef Py_ssize_t _EVENT_HEADER_SIZE = 5  # uint32 header + unknown byte
+
+
+cdef class FastReader:
+    """
+    Serves the event stream from an in-memory chunk, refilled from the replay file when exhausted.
+    """
+    cdef object read
+    cdef bytes buf
+    cdef const unsigned char[::1] view
+    cdef Py_ssize_t off
+    cdef Py_ssize_t end
+
+    def __cinit__(self, read):
+        self.read = read
+        self.buf = b""
+        self.view = self.buf
+        self.off = 0
+        self.end = 0
+
+    cdef int ensure(self, Py_ssize_t size) except -1:
+        cdef Py_ssize_t available = self.end - self.off
+        if available >= size:
+            return 0
+        self.buf = self.buf[self.off:] + self.read(max(size - available, _CHUNK_SIZE))
+        self.view = self.buf
+        self.off = 0
+        self.end = len(self.buf)
+        if self.end < size:
+            raise EOFError("Unexpected end of replay file")
+        return 0
+
+    cdef inline unsigned int read_uint32(self):
+        # Assemble byte by byte so the result is little-endian regardless of the host
+        cdef Py_ssize_t off = self.off
+        self.off += 4
+        return self.view[off] | self.view[off + 1] << 8 | self.view[off + 2] << 16 | <unsigned int>self.view[off + 3] << 24
+
+    cdef inline unsigned int read_uint16(self):
+        cdef Py_ssize_t off = self.off
+        self.off += 2
+        return self.view[off] | self.view[off + 1] << 8
+
+    cdef inline float read_float(self):
+        cdef unsigned int raw = self.read_uint32()
+        cdef float value
+        memcpy(&value, &raw, 4)
+        return value
+
+
+def iter_events(read, Py_ssize_t slice_count, list event_table, tuple driver_map):
+    """
+    Yields the same events as Replay._iter_events, reading the slices through `read`.
+    Events whose class in event_table is None are skipped, driver ids are mapped through driver_map.
+    """
+    cdef FastReader reader = FastReader(read)
+    cdef Py_ssize_t slice_event_count, event_size
+    cdef unsigned int event_header, event_class, event_type, driver_id
+    cdef float slice_time
+    for _ in range(slice_count):
+        reader.ensure(_SLICE_HEADER_SIZE)
+        slice_time = reader.read_float()
+        slice_event_count = reader.read_uint16()
+        for _ in range(slice_event_count):
+            reader.ensure(_EVENT_HEADER_SIZE)
+            event_header = reader.read_uint32()
+            reader.off += 1  # Unknown
+            event_size = (event_header >> 8) & 0x1ff
+            event_class = event_header >> 29
+            event_type = (event_header >> 17) & 0x03f
+            driver_id = event_header & 0x0ff
+            reader.ensure(event_size)
+            event = event_table[event_class][event_type]
+            if event is None:
+                reader.off += event_size
+                continue
+            # Copy the payload so kept events do not pin the whole chunk in memory
+            event_data = reader.buf[reader.off:reader.off + event_size]
+            reader.off += event_size
+            yield event(event_class=event_class, event_type=event_type, time=slice_time, driver=driver_map[driver_id], size=event_size, data=event_data)
@@ -1,12 +1,27 @@
 
 import argparse
 import gzip
-from io import BytesIO
-from typing import List
+import io
+import struct
+from typing import Dict, List
 from dataclasses import dataclass
 from enum import Enum
 import events as events
-from utils import read_integer, read_float, read_string, read_bytes_as_string
+from utils import read_integer, read_uint8, read_float, read_string, read_bytes_as_string
+
+try:
+    import _fastparse  # Optional compiled event loop, see _fastparse.pyx
+except ImportError:
+    _fastparse = None
+
+# Buffer size of the replay file reader, the event loop issues many small reads
+_READ_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Slice header: time and number of events in the slice
+_SLICE_HEADER = struct.Struct("<fH")
+
+# Event header (bit-packed size, class, type and driver) followed by one unknown byte
+_EVENT_HEADER = struct.Struct("<IB")
 
 _EVENT_TYPES = {
     # Telemetry events with driver data such as position, speed, engine RPM, etc.
@@ -33,6 +48,36 @@ _EVENT_TYPES = {
 }
 
 
+def _build_event_table(unknown):
+    """
+    Flattens _EVENT_TYPES into a table indexed by [event_class][event_type] (3 and 6 bits wide).
+    Unlisted combinations map to `unknown`.
+    """
+    table = [[unknown] * 64 for _ in range(8)]
+    for (event_class, event_type), event in _EVENT_TYPES.items():
+        table[event_class][event_type] = event
+    return table
+
+
+_EVENT_TABLE = _build_event_table(events.UnknownEvent)
+_KNOWN_EVENT_TABLE = _build_event_table(None)
+
+# Event driver ids by raw header value, 255 marks events not bound to a driver
+_DRIVER_MAP = (*range(255), None)
+
+# NumPy record layout of a telemetry payload, mirrors events._TELEMETRY
+_TELEMETRY_DTYPE = [
+    ("info1", "<u4"),
+    ("info2", "<u4"),
+    ("speed_info", "V5"),
+    ("unknown", "V25"),
+    ("tc_brakes", "u1"),
+    ("pos", "<f4", (3,)),
+    ("rot", "<f4", (3,)),
+]
+_TELEMETRY_SIZE = events._TELEMETRY.size
+
+
 class SessionType(Enum):
     TEST_DAY = 0
     PRACTICE = 1
@@ -89,34 +134,153 @@ class Replay:
 
     @property
     def events(self):
-        for _ in range(self.info.slice_count):
-            slice_time = read_float(self.vcr_file)
-            slice_event_count = read_integer(self.vcr_file, 2)
-            for _ in range(slice_event_count):
-                event_header = read_integer(self.vcr_file)
+        return self._iter_events(_EVENT_TABLE)
+
+    @property
+    def known_events(self):
+        """
+        Like `events`, but skips unknown events without constructing them.
+        """
+        return self._iter_events(_KNOWN_EVENT_TABLE)
+
+    def events_raw(self):
+        """
+        Walks the event stream without constructing event objects, for callers that decode only the payloads they need.
+        Yields (event_class, event_type, slice_time, driver_id, event_data) per event, where driver_id is 255 when the
+        event is not bound to a driver and event_data holds the payload bytes.
+        Like `events`, this consumes the replay stream.
+        """
+        # Bind loop invariants to locals once, the loops below run once per slice and event
+        slice_count = self.info.slice_count
+        read = self.vcr_file.read
+        unpack_slice_header = _SLICE_HEADER.unpack
+        unpack_header = _EVENT_HEADER.unpack
+        unpack_header_from = _EVENT_HEADER.unpack_from
+        for _ in range(slice_count):
+            slice_header = read(_SLICE_HEADER.size)
+            if len(slice_header) < _SLICE_HEADER.size:
+                raise EOFError("Unexpected end of replay file")
+            slice_time, slice_event_count = unpack_slice_header(slice_header)
+            if not slice_event_count:
+                continue
+            event_header = read(_EVENT_HEADER.size)
+            if len(event_header) < _EVENT_HEADER.size:
+                raise EOFError("Unexpected end of replay file")
+            event_header, _ = unpack_header(event_header)
+            for remaining in range(slice_event_count - 1, -1, -1):
                 event_size = (event_header >> 8) & 0x1ff
                 event_class = event_header >> 29
                 event_type = (event_header >> 17) & 0x03f
                 driver_id = event_header & 0x0ff
-                self.vcr_file.read(1)  # Unknown
-                event_data = self.vcr_file.read(event_size)
-                event = _EVENT_TYPES.get((event_class, event_type), events.UnknownEvent)
-                yield event(event_class=event_class, event_type=event_type, time=slice_time, driver=driver_id if driver_id != 255 else None, size=event_size, data=BytesIO(event_data))
+                if remaining:
+                    # Read the payload together with the header of the next event in the slice
+                    chunk = read(event_size + _EVENT_HEADER.size)
+                    if len(chunk) < event_size + _EVENT_HEADER.size:
+                        raise EOFError("Unexpected end of replay file")
+                    event_data = chunk[:event_size]
+                    event_header, _ = unpack_header_from(chunk, event_size)
+                else:
+                    event_data = read(event_size)
+                    if len(event_data) < event_size:
+                        raise EOFError("Unexpected end of replay file")
+                yield event_class, event_type, slice_time, driver_id, event_data
+
+    def _iter_events(self, event_table):
+        # Events whose class in event_table is None are skipped.
+        # There are two implementations: the compiled loop in _fastparse walks the slices itself and bypasses
+        # events_raw, the pure Python fallback dispatches on top of events_raw. Both share event_table and
+        # _DRIVER_MAP and raise EOFError on truncated replays, keep them in sync when changing either.
+        if _fastparse is not None:
+            yield from _fastparse.iter_events(self.vcr_file.read, self.info.slice_count, event_table, _DRIVER_MAP)
+            return
+        driver_map = _DRIVER_MAP
+        # events_raw raises on short payloads, so the payload length is the event size from the header
+        for event_class, event_type, slice_time, driver_id, event_data in self.events_raw():
+            event = event_table[event_class][event_type]
+            if event is None:
+                continue
+            yield event(event_class=event_class, event_type=event_type, time=slice_time, driver=driver_map[driver_id], size=len(event_data), data=event_data)
+
+    def telemetry_array(self) -> Dict[str, "numpy.ndarray"]:
+        """
+        Decodes all telemetry events into NumPy arrays, one array per field with one entry per event.
+        Field names match the attributes of TelemetryEvent, plus `time` and `driver`
+        (255 when the event is not bound to a driver). Requires numpy.
+        Like `events`, this consumes the replay stream, so only one of them can be used per Replay.
+        """
+        import numpy as np
+
+        times = []
+        drivers = []
+        event_types = []
+        payloads = []
+        event_table = _EVENT_TABLE
+        telemetry = events.TelemetryEvent
+        for event_class, event_type, slice_time, driver_id, event_data in self.events_raw():
+            if event_table[event_class][event_type] is telemetry:
+                if len(event_data) < _TELEMETRY_SIZE:
+                    # Same failure as decoding it as a TelemetryEvent, instead of shifting all later records
+                    raise struct.error(f"Telemetry payload requires at least {_TELEMETRY_SIZE} bytes (actual size is {len(event_data)})")
+                times.append(slice_time)
+                drivers.append(driver_id)
+                event_types.append(event_type)
+                payloads.append(event_data[:_TELEMETRY_SIZE])
+        data = np.frombuffer(b"".join(payloads), dtype=np.dtype(_TELEMETRY_DTYPE))
+        info1 = data["info1"]
+        info2 = data["info2"]
+        tc_brakes = data["tc_brakes"]
+        pos = data["pos"]
+        rot = data["rot"]
+        return {
+            "time": np.array(times, dtype=np.float32),
+            "driver": np.array(drivers, dtype=np.uint8),
+            "gear": np.array(event_types, dtype=np.int8) - 8,
+            "steer_yaw": info1 & 127,
+            "throttle": info1 >> 11 & 63,
+            "engine_rpm": info1 >> 18,
+            "in_pit": (info1 >> 17 & 0x1) != 0,
+            "horn": (info1 >> 10 & 0x1) != 0,
+            "acceleration": info2 >> 24 & 0xFF,
+            "following": (info2 >> 23 & 0x1) != 0,
+            "warning_light": (info2 >> 22 & 0x1) != 0,
+            "driver_visible": (info2 >> 21 & 0x1) != 0,
+            "head_light": (info2 >> 20 & 0x1) != 0,
+            "current_driver": info2 >> 18 & 0x03,
+            "dpart_mask": info2 & events._DPART_MASK,
+            "tc_level": tc_brakes >> 6,
+            "brakes": tc_brakes & 0x3F,
+            "pos_x": pos[:, 0],
+            "pos_y": pos[:, 1],
+            "pos_z": pos[:, 2],
+            "rot_x": rot[:, 0],
+            "rot_y": rot[:, 1],
+            "rot_z": rot[:, 2],
+        }
 
     @staticmethod
     def _open_vcr_file(file_path):
-        vcr_file = open(file_path, "rb")
         gz_header = b"\x1f\x8b"
-        gz = vcr_file.read(2)
+        with open(file_path, "rb", buffering=0) as probe:
+            gz = probe.read(2)
         if gz == gz_header:
-            vcr_file.close()
-            vcr_file = gzip.open(file_path, "rb")
+            # Serve the many small event reads from a large buffer instead of going through GzipFile.read each time
+            vcr_file = io.BufferedReader(gzip.open(file_path, "rb"), buffer_size=_READ_BUFFER_SIZE)
+        else:
+            vcr_file = open(file_path, "rb", buffering=_READ_BUFFER_SIZE)
         return vcr_file
 
     def _read_replay_info(self) -> ReplayInfo:
-        # Find the start of the vcr header (index of occurrence of 0x0A)
-        header = self.vcr_file.read().find(b"\x0A") + 1
-        self.vcr_file.seek(header)
+        # Skip to the start of the vcr header (after the first occurrence of 0x0A), scanning only the buffered
+        # bytes instead of reading (and for gzip, decompressing) the whole file and seeking back
+        while True:
+            buffered = self.vcr_file.peek()
+            if not buffered:
+                raise ValueError("No vcr header found")
+            newline_index = buffered.find(b"\x0A")
+            if newline_index != -1:
+                self.vcr_file.read(newline_index + 1)
+                break
+            self.vcr_file.read(len(buffered))
         self.vcr_file.read(4)  # isr tag
         version = self.vcr_file.read(4)
         rfm = read_string(self.vcr_file)
@@ -150,7 +314,7 @@ class Replay:
         )
 
     def _read_session_info(self) -> (SessionType, bool):
-        session_info = read_integer(self.vcr_file, 1)
+        session_info = read_uint8(self.vcr_file)
         session_type_number = session_info & 0xF
         print(f"session_type_number: {session_type_number}")
         if session_type_number == 0:
@@ -172,7 +336,7 @@ class Replay:
         drivers: List[Driver] = []
         driver_count = read_integer(self.vcr_file)
         for _ in range(driver_count):
-            num = read_integer(self.vcr_file, 1)
+            num = read_uint8(self.vcr_file)
             name = read_string(self.vcr_file, 1)
             codriver_name = read_string(self.vcr_file, 1)
             vehicle_name = read_string(self.vcr_file, 2)
@@ -215,7 +379,5 @@ if __name__ == "__main__":
         for driver in replay.drivers:
             print(f"  #{driver.num} {driver.name}")
         print("Events:")
-        for event in replay.events:
-            if isinstance(event, events.UnknownEvent):
-                continue  # Skip unknown events
+        for event in replay.known_events:
             print(event)